@@ -1,17 +1,40 @@
 # app.py — Clean UI: Upload -> Play -> A* (no deprecated params)
 import streamlit as st
 from PIL import Image
-import io, hashlib
+import functools, io, hashlib, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Tuple
 
 from puzzle import (
-    GOAL, is_solved, is_solvable, a_star,
+    GOAL, is_solved, is_solvable, a_star, ida_star, bidir_bfs, load_pdb,
     can_slide, slide_if_adjacent, scramble_via_random_walk
 )
-from image_utils import square_and_resize, slice_into_tiles, render_grid
+from image_utils import square_and_resize, slice_into_tiles, render_grid, blurred_board
 
 State = Tuple[int, ...]
 
+@st.cache_resource(show_spinner=False)
+def _pattern_db():
+    # Built (or unpickled from disk) once per server process, shared by all sessions
+    return load_pdb()
+
+PDB_SOLVER = "A* (pattern database)"
+COMPILED_SOLVER = "A* (Manhattan)"
+SOLVERS = {
+    PDB_SOLVER: a_star,            # pdb is bound in _submit_solve
+    "Bidirectional BFS": bidir_bfs,
+    "IDA* (Manhattan + linear conflict)": ida_star,
+    COMPILED_SOLVER: a_star,       # submitted without a callback, see _submit_solve
+}
+# Auto: short scrambles are solved fastest by meeting in the middle (no PDB build needed)
+AUTO = "Auto"
+BIDIR_MAX_STEPS = 40
+
+def _pick_solver(choice: str, scramble_steps: int) -> str:
+    if choice != AUTO:
+        return choice
+    return "Bidirectional BFS" if scramble_steps <= BIDIR_MAX_STEPS else PDB_SOLVER
+
 st.set_page_config(page_title="8-Puzzle — Upload • Play • A*", layout="wide")
 
 st.markdown("""
@@ -22,6 +45,70 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_data(show_spinner=False, max_entries=8, ttl=24*60*60)
+def _prepare_tiles(img_bytes: bytes, size: int = 540):
+    img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
+    img = square_and_resize(img, size)
+    return img, slice_into_tiles(img)
+
+@st.cache_data(show_spinner=False, ttl=24*60*60)
+def crop_and_resize(path, size=(1000, 1000)):
+    img = Image.open(path).convert("RGB")
+    w, h = img.size
+    min_dim = min(w, h)
+    left = (w - min_dim) // 2
+    top = (h - min_dim) // 2
+    right = left + min_dim
+    bottom = top + min_dim
+    img = img.crop((left, top, right, bottom))
+    return img.resize(size)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _blurred_bg(img_hash: str, blur_radius: int, size: int, _img):
+    # Shared across sessions, so it must stay untouched: render_grid only reads it as the
+    # alpha_composite base (which returns a new image) and draws on that result
+    return blurred_board(_img, size, blur_radius)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _render_board(state: State, img_hash: str, show_numbers: bool, show_guide_bg: bool,
+                  blur_radius: int, tile_alpha: int, _tiles, _orig_img):
+    # img_hash stands in for the unhashed _tiles/_orig_img in the cache key
+    template = None
+    if show_guide_bg:
+        size = _orig_img.size[0] // 3 * 3
+        template = _blurred_bg(img_hash, blur_radius, size, _orig_img)
+    return render_grid(
+        state,
+        _tiles,
+        show_numbers=show_numbers,
+        board_template=template,
+        tile_alpha=tile_alpha
+    )
+
+@st.cache_resource
+def _solver_pool():
+    # Shared by all sessions; solves run here so the script can poll and stay responsive
+    return ThreadPoolExecutor(max_workers=2)
+
+def _submit_solve(solver_name: str, start: State) -> dict:
+    job = {"solver": solver_name, "start": start, "expanded": 0,
+           "cancel": threading.Event(), "t0": time.monotonic()}
+    def report(expanded: int) -> bool:
+        job["expanded"] = expanded
+        return job["cancel"].is_set()
+    solve = SOLVERS[solver_name]
+    if solver_name == PDB_SOLVER:
+        # resolve the cached table here: pool threads have no Streamlit script context
+        solve = functools.partial(a_star, pdb=_pattern_db())
+    if solver_name == COMPILED_SOLVER:
+        # a_star only takes the Numba path without a callback; it solves in milliseconds,
+        # so this entry trades live progress/cancel for the compiled search
+        job["future"] = _solver_pool().submit(solve, start)
+    else:
+        job["future"] = _solver_pool().submit(solve, start, report)
+    return job
+
+
 def init_state():
     st.session_state.setdefault("tiles", None)
     st.session_state.setdefault("current", GOAL)
@@ -32,6 +119,9 @@ def init_state():
     st.session_state.setdefault("show_numbers", True)
     st.session_state.setdefault("orig_img", None)
     st.session_state.setdefault("show_guide_bg", True)
+    st.session_state.setdefault("solve_job", None)
+    st.session_state.setdefault("solve_msg", None)     # (st method name, text) from the last finished solve
+    st.session_state.setdefault("scramble_steps", 0)   # upper bound on moves from GOAL
 init_state()
 
 st.title("8-Puzzle: Upload → Play → A* Solver")
@@ -44,11 +134,11 @@ with st.sidebar:
         data = up.getvalue()
         h = hashlib.md5(data).hexdigest()
         if st.session_state.img_hash != h:
-            img = Image.open(io.BytesIO(data)).convert("RGB")
-            img = square_and_resize(img, 540)
+            img, tiles = _prepare_tiles(data, 540)
             st.session_state.orig_img = img
-            st.session_state.tiles = slice_into_tiles(img)
+            st.session_state.tiles = tiles
             st.session_state.current = GOAL
+            st.session_state.scramble_steps = 0
             st.session_state.solution = []
             st.session_state.metrics = {}
             st.session_state.step_idx = 0
@@ -63,6 +153,7 @@ with st.sidebar:
             st.warning("Upload an image first.")
         else:
             st.session_state.current = scramble_via_random_walk(steps=steps)
+            st.session_state.scramble_steps = steps
             st.session_state.solution = []
             st.session_state.metrics = {}
             st.session_state.step_idx = 0
@@ -70,7 +161,10 @@ with st.sidebar:
 
     st.divider()
     st.header("3) Solve")
-    if st.button("🧠 Solve with A*"):
+    solver_choice = st.radio("Algorithm", [AUTO, *SOLVERS], key="solver",
+                             help=f"Auto uses bidirectional BFS for scrambles of ≤{BIDIR_MAX_STEPS} steps, else A* with the pattern database.")
+    # The disabled flag is decided before this run may submit a job, so the handler re-checks
+    if st.button("🧠 Solve", disabled=st.session_state.solve_job is not None) and st.session_state.solve_job is None:
         if st.session_state.tiles is None:
             st.warning("Upload an image first.")
         else:
@@ -78,21 +172,46 @@ with st.sidebar:
             if not is_solvable(start):
                 st.error("Not solvable (unexpected with Shuffle). Shuffle again.")
             else:
-                with st.spinner("A* (Manhattan)…"):
-                    path, metrics = a_star(start)
-                if not path:
-                    st.error("No solution found.")
-                else:
-                    st.session_state.solution = path
-                    st.session_state.metrics = metrics
-                    st.session_state.step_idx = 0
-                    st.success(f"Solved in {metrics['length']} moves — expanded {metrics['expanded']} nodes.")
+                solver_name = _pick_solver(solver_choice, st.session_state.scramble_steps)
+                st.session_state.solve_job = _submit_solve(solver_name, start)
+
+    job = st.session_state.solve_job
+    if job is not None:
+        # Reruns (e.g. Cancel) land here again and keep polling the same future
+        if st.button("✖ Cancel"):
+            job["cancel"].set()
+        status = st.empty()
+        # wait() returns as soon as the job finishes, so fast solves show no polling delay
+        while not wait([job["future"]], timeout=0.2).done:
+            elapsed = max(time.monotonic() - job["t0"], 1e-3)
+            status.info(f"{job['solver']}… expanded {job['expanded']:,} nodes ({job['expanded']/elapsed:,.0f}/s)")
+        status.empty()
+        st.session_state.solve_job = None
+        path, metrics = job["future"].result()
+        if metrics.get("cancelled"):
+            st.session_state.solve_msg = ("warning", f"Cancelled after expanding {metrics['expanded']} nodes.")
+        elif st.session_state.current != job["start"]:
+            st.session_state.solve_msg = ("info", "Board changed while solving; solution discarded.")
+        elif not path:
+            st.session_state.solve_msg = ("error", "No solution found.")
+        else:
+            st.session_state.solution = path
+            st.session_state.metrics = metrics
+            st.session_state.step_idx = 0
+            st.session_state.solve_msg = ("success", f"Solved in {metrics['length']} moves — expanded {metrics['expanded']} nodes.")
+        # rerun so Solve/Cancel are redrawn for the idle state
+        st.rerun()
+    elif st.session_state.solve_msg is not None:
+        kind, text = st.session_state.solve_msg
+        st.session_state.solve_msg = None
+        getattr(st, kind)(text)
 
     st.divider()
     st.header("4) Options")
     st.session_state.show_numbers = st.checkbox("Show numbers on tiles", value=st.session_state.show_numbers)
     if st.button("↩ Reset to Goal"):
         st.session_state.current = GOAL
+        st.session_state.scramble_steps = 0
         st.session_state.solution = []
         st.session_state.metrics = {}
         st.session_state.step_idx = 0
@@ -109,35 +228,27 @@ with col_left:
         st.divider()
         st.subheader("Default images")
 
-        
-        def crop_and_resize(path, size=(1000, 1000)):
-            img = Image.open(path).convert("RGB")
-            w, h = img.size
-            min_dim = min(w, h)
-            left = (w - min_dim) // 2
-            top = (h - min_dim) // 2
-            right = left + min_dim
-            bottom = top + min_dim
-            img = img.crop((left, top, right, bottom))
-            return img.resize(size)
-
         default_paths = [
             "static/nature.jpeg",
             "static/boat.avif",
             "static/mountain.avif",
             "static/elephant.jpg"
         ]
-        default_images = [(path, crop_and_resize(path)) for path in default_paths]
+        # Decode/resize runs in PIL's C code with the GIL released, so the four files load in parallel
+        with ThreadPoolExecutor(len(default_paths)) as ex:
+            default_images = list(zip(default_paths, ex.map(crop_and_resize, default_paths)))
         cols = st.columns(4)
 
         for i, (path, img) in enumerate(default_images):
             with cols[i]:
                 st.image(img, use_container_width=False)
                 if st.button(f"{i+1}", key=f"default_{i}"):
-                    img = square_and_resize(Image.open(path).convert("RGB"), 540)
+                    with open(path, "rb") as f:
+                        img, tiles = _prepare_tiles(f.read(), 540)
                     st.session_state.orig_img = img
-                    st.session_state.tiles = slice_into_tiles(img)
+                    st.session_state.tiles = tiles
                     st.session_state.current = GOAL
+                    st.session_state.scramble_steps = 0
                     st.session_state.solution = []
                     st.session_state.metrics = {}
                     st.session_state.step_idx = 0
@@ -147,13 +258,15 @@ with col_left:
 
     else:
         showing = st.session_state.solution[st.session_state.step_idx] if st.session_state.solution else st.session_state.current
-        board_img = render_grid(
-            showing,
+        board_img = _render_board(
+            tuple(showing),
+            st.session_state.img_hash,
+            st.session_state.show_numbers,
+            st.session_state.show_guide_bg,
+            8,
+            235 if st.session_state.show_guide_bg else 255,
             st.session_state.tiles,
-            show_numbers=st.session_state.show_numbers,
-            background=st.session_state.orig_img if st.session_state.show_guide_bg else None,
-            blur_radius=8,
-            tile_alpha=235 if st.session_state.show_guide_bg else 255
+            st.session_state.orig_img
         )
         st.image(board_img, caption="3×3 tiles (bottom-right is the blank)", use_container_width=True)
 
@@ -178,6 +291,7 @@ with col_right:
                         if st.button(label, key=f"tile-{i}", use_container_width=True):
                             if can_slide(cur, i):
                                 st.session_state.current = slide_if_adjacent(cur, i)
+                                st.session_state.scramble_steps += 1
                                 st.session_state.solution = []
                                 st.session_state.metrics = {}
                                 st.session_state.step_idx = 0
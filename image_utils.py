@@ -1,5 +1,7 @@
 # image_utils.py — EXIF-aware slice to 3×3 and render with grid + numbers
-from typing import Dict, Tuple
+import functools
+from typing import Tuple
+import numpy as np
 from PIL import Image, ImageOps, ImageDraw, ImageFont, ImageFilter
 
 def fix_orientation(img: Image.Image) -> Image.Image:
@@ -21,59 +23,64 @@ def square_and_resize(img: Image.Image, target: int = 540) -> Image.Image:
     img = fix_orientation(img)
     return ImageOps.fit(img, (target, target), method=Image.Resampling.LANCZOS)
 
-def slice_into_tiles(img: Image.Image) -> Dict[int, Image.Image]:
+def slice_into_tiles(img: Image.Image) -> np.ndarray:
+    # (9, tile, tile, 4) uint8 RGBA, indexed by tile value: 0 = blank, k = image slot k-1 (row-major)
     size = img.size[0]
     tile = size // 3
-    tiles: Dict[int, Image.Image] = {}
-    k = 1
-    for r in range(3):
-        for c in range(3):
-            box = (c*tile, r*tile, (c+1)*tile, (r+1)*tile)
-            crop = img.crop(box)
-            if (r, c) == (2, 2):
-                tiles[0] = _make_blank(tile)
-            else:
-                d = ImageDraw.Draw(crop)
-                d.rectangle([0,0,tile-1,tile-1], outline=(50,50,50), width=1)
-                tiles[k] = crop
-                k += 1
+    arr = np.asarray(img.convert("RGB"))[:3*tile, :3*tile]
+    # (3t,3t,3) -> (row, y, col, x, ch) -> (row, col, y, x, ch) -> 9 slot tiles, no per-tile crops
+    slots = arr.reshape(3, tile, 3, tile, 3).transpose(0, 2, 1, 3, 4).reshape(9, tile, tile, 3)
+    tiles = np.empty((9, tile, tile, 4), dtype=np.uint8)
+    tiles[1:, ..., :3] = slots[:8]
+    tiles[0, ..., :3] = np.asarray(_make_blank(tile))
+    tiles[..., 3] = 255
+    # 1px dark border around every image tile
+    border = tiles[1:, ..., :3]
+    border[:, 0] = 50; border[:, -1] = 50
+    border[:, :, 0] = 50; border[:, :, -1] = 50
     return tiles
 
-def _draw_centered_number(draw: ImageDraw.ImageDraw, xy: Tuple[int,int], size: int, text: str):
-    # Draw larger, bolder, centered numbers with robust font fallback and outline for contrast
+@functools.lru_cache(maxsize=16)
+def _get_font(px: int):
     # Try multiple common fonts; fall back to default if none available.
-    font = None
     for name in ["DejaVuSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf", "Arial.ttf", "arial.ttf"]:
         try:
-            font = ImageFont.truetype(name, size=int(size*0.58))
-            break
+            return ImageFont.truetype(name, size=px)
         except Exception:
             continue
-    if font is None:
-        font = ImageFont.load_default()
+    return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=64)
+def _text_size(text: str, px: int) -> Tuple[int,int]:
+    bbox = _get_font(px).getbbox(text, stroke_width=4)
+    return bbox[2]-bbox[0], bbox[3]-bbox[1]
+
+def _draw_centered_number(draw: ImageDraw.ImageDraw, xy: Tuple[int,int], size: int, text: str):
+    # Draw larger, bolder, centered numbers with robust font fallback and outline for contrast
+    px = int(size*0.58)
+    font = _get_font(px)
     # Compute centered position
-    bbox = draw.textbbox((0,0), text, font=font, stroke_width=4)
-    tw = bbox[2]-bbox[0]; th = bbox[3]-bbox[1]
+    tw, th = _text_size(text, px)
     x = xy[0] + (size - tw)//2
     y = xy[1] + (size - th)//2
     # White text with black outline for maximum legibility on any image
     draw.text((x, y), text, fill=(255,255,255), font=font, stroke_width=4, stroke_fill=(0,0,0))
 
-def render_grid(state: Tuple[int, ...], tiles: Dict[int, Image.Image], show_numbers: bool = True, background: Image.Image = None, blur_radius: int = 6, tile_alpha: int = 255) -> Image.Image:
-    tile_size = next(iter(tiles.values())).size[0]
-    # Prepare base board (optional blurred background of the original image)
-    if background is not None:
-        bg = ImageOps.fit(background, (tile_size*3, tile_size*3), method=Image.Resampling.LANCZOS).filter(ImageFilter.GaussianBlur(blur_radius))
-        board = bg.convert("RGBA")
+def blurred_board(background: Image.Image, size: int, blur_radius: int = 6) -> Image.Image:
+    bg = ImageOps.fit(background, (size, size), method=Image.Resampling.LANCZOS).filter(ImageFilter.GaussianBlur(blur_radius))
+    return bg.convert("RGBA")
+
+def render_grid(state: Tuple[int, ...], tiles: np.ndarray, show_numbers: bool = True, board_template: Image.Image = None, tile_alpha: int = 255) -> Image.Image:
+    tile_size = tiles.shape[1]
+    # Assemble the 3×3 board in one gather: (9,t,t,4) in state order -> (3t,3t,4)
+    board_arr = tiles[list(state)].reshape(3, 3, tile_size, tile_size, 4).transpose(0, 2, 1, 3, 4).reshape(3*tile_size, 3*tile_size, 4)
+    if tile_alpha < 255:
+        # Translucent tiles over the prepared template (e.g. blurred original), or plain white
+        board_arr[..., 3] = tile_alpha
+        base = board_template if board_template is not None else Image.new("RGBA", (tile_size*3, tile_size*3), (255,255,255,255))
+        board = Image.alpha_composite(base, Image.fromarray(board_arr))
     else:
-        board = Image.new("RGBA", (tile_size*3, tile_size*3), (255,255,255,255))
-    for i, v in enumerate(state):
-        r, c = divmod(i, 3)
-        tile_img = tiles[v].convert("RGBA")
-        if tile_alpha < 255:
-            tile_img = tile_img.copy()
-            tile_img.putalpha(tile_alpha)
-        board.paste(tile_img, (c*tile_size, r*tile_size), tile_img)
+        board = Image.fromarray(board_arr)
     d = ImageDraw.Draw(board)
     for k in range(4):
         x = k*tile_size; y = k*tile_size
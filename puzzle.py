@@ -1,122 +1,347 @@
-# puzzle.py — 8-puzzle core logic + A* (Manhattan) + helpers
-from dataclasses import dataclass, field
-from typing import Tuple, List, Dict, Optional
-import heapq, random
+# puzzle.py — 8-puzzle core logic + A* (Manhattan / PDB) + IDA* (linear conflict) + bidirectional BFS + helpers
+from collections import deque
+from typing import Callable, Tuple, List, Dict, Optional
+import itertools, os, pickle, random
+
+try:
+    from puzzle_numba import MD as MD_NP, NEIGHBOR_TABLE, astar_int
+except ImportError:                # numba/numpy not installed: pure-Python search only
+    astar_int = None
 
 State = Tuple[int, ...]            # 9 ints 0..8; 0 = blank
 GOAL: State = (1,2,3,4,5,6,7,8,0)
 
+# Solvers call progress(expanded) every PROGRESS_EVERY expansions; a truthy
+# return cancels the search, which then reports {"cancelled": True}.
+Progress = Callable[[int], bool]
+PROGRESS_EVERY = 2048
+
+# Search-side encoding: one int, slot i stored in the nibble at bits 4i..4i+3.
+# Hashing/comparing an int is a single word op, unlike a 9-tuple.
+Packed = int
+
+# NEIGHBORS[z]: slots that can slide into the blank when it sits at slot z
+NEIGHBORS: Tuple[Tuple[int, ...], ...] = (
+    (1,3), (0,2,4), (1,5),
+    (0,4,6), (1,3,5,7), (2,4,8),
+    (3,7), (4,6,8), (5,7),
+)
+
 def index_to_rc(i: int) -> Tuple[int,int]:
     return divmod(i, 3)
 
 def rc_to_index(r: int, c: int) -> int:
     return r*3 + c
 
+def encode(state: State) -> Packed:
+    p = 0
+    for i, v in enumerate(state):
+        p |= v << (4*i)
+    return p
+
+def decode(p: Packed) -> State:
+    return tuple((p >> (4*i)) & 0xF for i in range(9))
+
+GOAL_INT: Packed = encode(GOAL)    # 0x087654321
+
 def is_solved(s: State) -> bool:
     return s == GOAL
 
 def is_solvable(state: State) -> bool:
-    arr = [x for x in state if x != 0]
+    # seen has bit v set for every tile already scanned; the bits above v are
+    # exactly the earlier, larger tiles, i.e. the inversions v takes part in
+    seen = 0
     inv = 0
-    for i in range(len(arr)):
-        for j in range(i+1, len(arr)):
-            inv += arr[i] > arr[j]
+    for v in state:
+        if v:
+            inv += bin(seen >> v).count("1")
+            seen |= 1 << v
     return inv % 2 == 0
 
 def neighbors(state: State) -> List[State]:
-    out: List[State] = []
     z = state.index(0)
-    zr, zc = index_to_rc(z)
-    for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-        r, c = zr+dr, zc+dc
-        if 0 <= r < 3 and 0 <= c < 3:
-            j = rc_to_index(r, c)
-            s = list(state)
-            s[z], s[j] = s[j], s[z]
-            out.append(tuple(s))
-    return out
-
-def manhattan(state: State) -> int:
-    total = 0
-    for i, v in enumerate(state):
-        if v == 0: 
-            continue
-        r, c = index_to_rc(i)
-        gr, gc = index_to_rc(v-1)
-        total += abs(r-gr) + abs(c-gc)
-    return total
+    return [swap_tuple(state, z, j) for j in NEIGHBORS[z]]
 
-@dataclass(order=True)
-class Node:
-    f: int
-    state: State = field(compare=False)
-    g: int = field(compare=False)
-    parent: Optional["Node"] = field(compare=False, default=None)
+# MD[i][v]: Manhattan distance of tile v sitting in slot i from its goal slot (blank costs 0)
+MD: List[List[int]] = [
+    [0 if v == 0 else abs(i//3 - (v-1)//3) + abs(i%3 - (v-1)%3) for v in range(9)]
+    for i in range(9)
+]
 
-def _reconstruct(n: Node) -> List[State]:
+def manhattan(p: Packed) -> int:
+    return (MD[0][p & 0xF]       + MD[1][p >> 4 & 0xF]  + MD[2][p >> 8 & 0xF] +
+            MD[3][p >> 12 & 0xF] + MD[4][p >> 16 & 0xF] + MD[5][p >> 20 & 0xF] +
+            MD[6][p >> 24 & 0xF] + MD[7][p >> 28 & 0xF] + MD[8][p >> 32 & 0xF])
+
+def delta_manhattan(prev_h: int, z: int, j: int, tile: int) -> int:
+    # h after sliding `tile` from slot j into the blank at slot z
+    return prev_h - MD[j][tile] + MD[z][tile]
+
+# Pattern database: exact distance to GOAL for all 9!/2 reachable boards, from one
+# BFS backwards from the goal. Used as the heuristic, A* walks straight down the
+# optimal path. Pickled to PDB_PATH so later processes skip the ~0.2 s build.
+PDB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "pdb.pkl")
+
+def build_pdb() -> Dict[Packed, int]:
+    dist: Dict[Packed, int] = {GOAL_INT: 0}
+    frontier = deque([(GOAL_INT, GOAL.index(0))])
+    while frontier:
+        p, z = frontier.popleft()
+        d = dist[p] + 1
+        for j in NEIGHBORS[z]:
+            tile = (p >> (4*j)) & 0xF
+            nxt = p + (tile << (4*z)) - (tile << (4*j))
+            if nxt not in dist:
+                dist[nxt] = d
+                frontier.append((nxt, j))
+    return dist
+
+PDB_SIZE = 181440                  # 9!/2 boards reachable from GOAL
+
+def load_pdb(path: str = PDB_PATH) -> Dict[Packed, int]:
+    try:
+        with open(path, "rb") as f:
+            pdb = pickle.load(f)
+        if isinstance(pdb, dict) and len(pdb) == PDB_SIZE:
+            return pdb
+    except Exception:              # missing, truncated, stale or foreign file: rebuild it
+        pass
+    pdb = build_pdb()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(pdb, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:                # read-only checkout: keep the in-memory table
+        pass
+    return pdb
+
+def _reconstruct(nodes: List[Tuple[Packed, int, int]], idx: int) -> List[State]:
     path: List[State] = []
-    while n is not None:
-        path.append(n.state)
-        n = n.parent
+    while idx >= 0:
+        p, idx, _ = nodes[idx]
+        path.append(decode(p))
     path.reverse()
     return path
 
-def a_star(start: State):
+def a_star(start: State, progress: Optional[Progress] = None, pdb: Optional[Dict[Packed, int]] = None):
     if is_solved(start):
         return [start], {"expanded": 0, "length": 0}
-    openh: List[Node] = []
-    gbest: Dict[State, int] = {start: 0}
-    heapq.heappush(openh, Node(manhattan(start), start, 0, None))
-    best_seen_g: Dict[State, int] = {}
+    if pdb is not None:
+        if encode(start) not in pdb:   # PDB covers exactly the solvable boards
+            return [], {"expanded": 0, "length": 0}
+        return _a_star_py(start, progress, pdb)
+    if astar_int is not None and progress is None:
+        # the compiled search cannot call back into Python, so it serves callers that
+        # don't need progress reports or cancellation
+        packed_path, expanded = astar_int(encode(start), GOAL_INT, MD_NP, NEIGHBOR_TABLE)
+        path = [decode(int(p)) for p in packed_path]
+        return path, {"expanded": int(expanded), "length": max(len(path)-1, 0)}
+    return _a_star_py(start, progress)
+
+# f = g + h stays small (g <= 31, h <= 31 for any board), so the open list is a
+# bucket queue indexed by f: O(1) push/pop, LIFO within a bucket (dives deep on ties)
+_MAX_F = 64
+
+def _a_star_py(start: State, progress: Optional[Progress] = None, pdb: Optional[Dict[Packed, int]] = None):
+    p0 = encode(start)
+    # buckets[f] holds (g, idx); nodes[idx] = (state, parent idx, blank slot)
+    nodes: List[Tuple[Packed, int, int]] = [(p0, -1, start.index(0))]
+    buckets: List[List[Tuple[int, int]]] = [[] for _ in range(_MAX_F)]
+    f = pdb[p0] if pdb is not None else manhattan(p0)
+    buckets[f].append((0, 0))
+    gbest: Dict[Packed, int] = {p0: 0}
     expanded = 0
-    while openh:
-        cur = heapq.heappop(openh)
-        if cur.state in best_seen_g and best_seen_g[cur.state] < cur.g:
+    while f < _MAX_F:
+        bucket = buckets[f]
+        if not bucket:             # consistent h: children never land below f
+            f += 1
             continue
-        if is_solved(cur.state):
-            path = _reconstruct(cur)
+        g, idx = bucket.pop()
+        p, _, z = nodes[idx]
+        if g > gbest[p]:           # stale entry; a cheaper path was pushed later
+            continue
+        if p == GOAL_INT:
+            path = _reconstruct(nodes, idx)
             return path, {"expanded": expanded, "length": len(path)-1}
-        best_seen_g[cur.state] = cur.g
         expanded += 1
-        for nxt in neighbors(cur.state):
-            g2 = cur.g + 1
+        if progress is not None and not expanded % PROGRESS_EVERY and progress(expanded):
+            return [], {"expanded": expanded, "length": 0, "cancelled": True}
+        h = f - g
+        g2 = g + 1
+        for j in NEIGHBORS[z]:
+            tile = (p >> (4*j)) & 0xF
+            # blank nibble at z is 0, so the swap is one add and one subtract
+            nxt = p + (tile << (4*z)) - (tile << (4*j))
             if nxt not in gbest or g2 < gbest[nxt]:
                 gbest[nxt] = g2
-                heapq.heappush(openh, Node(g2 + manhattan(nxt), nxt, g2, cur))
+                nodes.append((nxt, idx, j))
+                h2 = pdb[nxt] if pdb is not None else delta_manhattan(h, z, j, tile)
+                buckets[g2 + h2].append((g2, len(nodes)-1))
+    return [], {"expanded": expanded, "length": 0}
+
+# Linear conflict: two tiles in their goal line but in reversed order force one of
+# them out of the line and back (+2 moves). Per line the cost is 2 * the number of
+# tiles to remove, i.e. tiles not on the longest increasing run of goal positions.
+# LC_ROWS[r] / LC_COLS[c] map a line's three nibbles (packed as t0|t1<<4|t2<<8) to that cost.
+def _line_conflict(tiles: Tuple[int, int, int], line: int, by_row: bool) -> int:
+    goals = []
+    for v in tiles:
+        if v == 0:
+            continue
+        gr, gc = index_to_rc(v-1)
+        if (gr if by_row else gc) == line:
+            goals.append(gc if by_row else gr)
+    lis = [1] * len(goals)
+    for a in range(len(goals)):
+        for b in range(a):
+            if goals[b] < goals[a]:
+                lis[a] = max(lis[a], lis[b] + 1)
+    return 2 * (len(goals) - max(lis, default=0))
+
+LC_ROWS: List[Dict[int, int]] = []
+LC_COLS: List[Dict[int, int]] = []
+for _line in range(3):
+    _rows: Dict[int, int] = {}
+    _cols: Dict[int, int] = {}
+    for _t in itertools.product(range(9), repeat=3):
+        _key = _t[0] | _t[1] << 4 | _t[2] << 8
+        _rows[_key] = _line_conflict(_t, _line, True)
+        _cols[_key] = _line_conflict(_t, _line, False)
+    LC_ROWS.append(_rows)
+    LC_COLS.append(_cols)
+
+def linear_conflict(p: Packed) -> int:
+    # column c gathers slots c, c+3, c+6: shift by 4c, then pull nibbles 3 and 6 down
+    q1 = p >> 4
+    q2 = p >> 8
+    return (LC_ROWS[0][p & 0xFFF] + LC_ROWS[1][p >> 12 & 0xFFF] + LC_ROWS[2][p >> 24 & 0xFFF] +
+            LC_COLS[0][p & 0xF | p >> 8 & 0xF0 | p >> 16 & 0xF00] +
+            LC_COLS[1][q1 & 0xF | q1 >> 8 & 0xF0 | q1 >> 16 & 0xF00] +
+            LC_COLS[2][q2 & 0xF | q2 >> 8 & 0xF0 | q2 >> 16 & 0xF00])
+
+def ida_star(start: State, progress: Optional[Progress] = None):
+    if is_solved(start):
+        return [start], {"expanded": 0, "length": 0}
+    if not is_solvable(start):     # IDA* would deepen forever on the wrong parity
+        return [], {"expanded": 0, "length": 0}
+    p0 = encode(start)
+    path: List[Packed] = [p0]
+    expanded = 0
+
+    def search(p: Packed, z: int, g: int, md: int, bound: int, prev_z: int) -> int:
+        # returns -1 once the goal is on `path`, -2 if cancelled, else the smallest f that exceeded bound
+        nonlocal expanded
+        f = g + md + linear_conflict(p)
+        if f > bound:
+            return f
+        if p == GOAL_INT:
+            return -1
+        expanded += 1
+        if progress is not None and not expanded % PROGRESS_EVERY and progress(expanded):
+            return -2
+        nxt_bound = 1 << 30
+        for j in NEIGHBORS[z]:
+            if j == prev_z:        # never undo the previous move
+                continue
+            tile = (p >> (4*j)) & 0xF
+            child = p + (tile << (4*z)) - (tile << (4*j))
+            path.append(child)
+            t = search(child, j, g+1, delta_manhattan(md, z, j, tile), bound, z)
+            if t < 0:
+                return t
+            nxt_bound = min(nxt_bound, t)
+            path.pop()
+        return nxt_bound
+
+    md0 = manhattan(p0)
+    bound = md0 + linear_conflict(p0)
+    z0 = start.index(0)
+    while True:
+        t = search(p0, z0, 0, md0, bound, -1)
+        if t == -2:
+            return [], {"expanded": expanded, "length": 0, "cancelled": True}
+        if t < 0:
+            break
+        bound = t
+    return [decode(p) for p in path], {"expanded": expanded, "length": len(path)-1}
+
+def bidir_bfs(start: State, progress: Optional[Progress] = None):
+    if is_solved(start):
+        return [start], {"expanded": 0, "length": 0}
+    if not is_solvable(start):     # the two searches would never meet
+        return [], {"expanded": 0, "length": 0}
+    p0 = encode(start)
+    # per side: state -> (parent state, depth); -1 marks the root
+    fwd: Dict[Packed, Tuple[Packed, int]] = {p0: (-1, 0)}
+    bwd: Dict[Packed, Tuple[Packed, int]] = {GOAL_INT: (-1, 0)}
+    fwd_front = [(p0, start.index(0))]
+    bwd_front = [(GOAL_INT, GOAL.index(0))]
+    expanded = 0
+    while fwd_front and bwd_front:
+        # grow the smaller frontier by one full level
+        forward = len(fwd_front) <= len(bwd_front)
+        front, seen, other = (fwd_front, fwd, bwd) if forward else (bwd_front, bwd, fwd)
+        depth = seen[front[0][0]][1] + 1
+        nxt_front = []
+        meet, best = -1, 1 << 30
+        for p, z in front:
+            expanded += 1
+            if progress is not None and not expanded % PROGRESS_EVERY and progress(expanded):
+                return [], {"expanded": expanded, "length": 0, "cancelled": True}
+            for j in NEIGHBORS[z]:
+                tile = (p >> (4*j)) & 0xF
+                child = p + (tile << (4*z)) - (tile << (4*j))
+                if child in seen:
+                    continue
+                seen[child] = (p, depth)
+                nxt_front.append((child, j))
+                # finish the level and keep the shortest crossing, not the first one found
+                if child in other and depth + other[child][1] < best:
+                    meet, best = child, depth + other[child][1]
+        if meet >= 0:
+            path: List[Packed] = []
+            p = meet
+            while p != -1:
+                path.append(p)
+                p = fwd[p][0]
+            path.reverse()
+            p = bwd[meet][0]
+            while p != -1:
+                path.append(p)
+                p = bwd[p][0]
+            return [decode(p) for p in path], {"expanded": expanded, "length": len(path)-1}
+        if forward:
+            fwd_front = nxt_front
+        else:
+            bwd_front = nxt_front
     return [], {"expanded": expanded, "length": 0}
 
 def can_slide(state: State, tile_index: int) -> bool:
-    z = state.index(0)
-    zr, zc = index_to_rc(z)
-    r, c = index_to_rc(tile_index)
-    return abs(zr - r) + abs(zc - c) == 1
+    return tile_index in NEIGHBORS[state.index(0)]
+
+def swap_tuple(state: State, i: int, j: int) -> State:
+    # built from slices, skipping the list(state) -> tuple(list) round trip
+    if i > j:
+        i, j = j, i
+    return state[:i] + (state[j],) + state[i+1:j] + (state[i],) + state[j+1:]
 
 def slide_if_adjacent(state: State, tile_index: int) -> State:
     if not can_slide(state, tile_index):
         return state
-    s = list(state)
-    z = s.index(0)
-    s[z], s[tile_index] = s[tile_index], s[z]
-    return tuple(s)
+    return swap_tuple(state, state.index(0), tile_index)
 
 def scramble_via_random_walk(steps: int = 50, seed: Optional[int] = None) -> State:
     rng = random.Random(seed)
     s = list(GOAL)
     z = s.index(0)
-    zr, zc = index_to_rc(z)
     last_swap = None
     for _ in range(steps):
-        opts = []
-        for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-            r, c = zr+dr, zc+dc
-            if 0 <= r < 3 and 0 <= c < 3:
-                j = rc_to_index(r, c)
-                opts.append(j)
-        if last_swap in opts and len(opts) > 1:
-            opts.remove(last_swap)
+        # every slot has at least two neighbours, so skipping the undo move never empties opts
+        opts = [j for j in NEIGHBORS[z] if j != last_swap]
         j = rng.choice(opts)
         s[z], s[j] = s[j], s[z]
         last_swap = z
         z = j
-        zr, zc = index_to_rc(z)
     return tuple(s)
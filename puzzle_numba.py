@@ -0,0 +1,138 @@
+# puzzle_numba.py — Numba-compiled A* over packed-int states (layout as in puzzle.py)
+import numpy as np
+from numba import njit
+
+# MD[i, v]: Manhattan distance of tile v sitting in slot i from its goal slot (blank costs 0)
+MD = np.array(
+    [[0 if v == 0 else abs(i//3 - (v-1)//3) + abs(i%3 - (v-1)%3) for v in range(9)] for i in range(9)],
+    dtype=np.int8,
+)
+
+# NEIGHBOR_TABLE[z]: slots that can slide into the blank at slot z, padded with -1
+NEIGHBOR_TABLE = np.full((9, 4), -1, dtype=np.int8)
+for _z in range(9):
+    _zr, _zc = divmod(_z, 3)
+    _k = 0
+    for _j in range(9):
+        _r, _c = divmod(_j, 3)
+        if abs(_zr - _r) + abs(_zc - _c) == 1:
+            NEIGHBOR_TABLE[_z, _k] = _j
+            _k += 1
+
+N_RANKS = 362880                   # 9!: every arrangement has a rank in [0, 9!)
+
+@njit(cache=True, nogil=True)
+def manhattan_int(s, MD):
+    h = 0
+    for i in range(9):
+        h += MD[i, (s >> (4*i)) & 0xF]
+    return h
+
+@njit(cache=True, nogil=True)
+def rank_int(s):
+    # Lehmer rank: for each slot, how many unused tile values are smaller
+    r = 0
+    seen = 0
+    for i in range(9):
+        v = (s >> (4*i)) & 0xF
+        smaller = 0
+        below = seen & ((1 << v) - 1)
+        while below:
+            below &= below - 1
+            smaller += 1
+        r = r*(9 - i) + v - smaller
+        seen |= 1 << v
+    return r
+
+# Heap entries are single int64 keys: f in bits 42+, (63 - g) in bits 36..41 (deeper
+# first on ties), packed state in bits 0..35. Min-heap order is then plain int order.
+@njit(cache=True, nogil=True)
+def _heap_push(heap, n, key):
+    i = n
+    while i > 0:
+        up = (i - 1) >> 1
+        if heap[up] <= key:
+            break
+        heap[i] = heap[up]
+        i = up
+    heap[i] = key
+
+@njit(cache=True, nogil=True)
+def _heap_pop(heap, n):
+    # n is the size before the pop
+    top = heap[0]
+    n -= 1
+    last = heap[n]
+    i = 0
+    while True:
+        child = 2*i + 1
+        if child >= n:
+            break
+        if child + 1 < n and heap[child + 1] < heap[child]:
+            child += 1
+        if last <= heap[child]:
+            break
+        heap[i] = heap[child]
+        i = child
+    heap[i] = last
+    return top
+
+@njit(cache=True, nogil=True)
+def astar_int(start_int, goal_int, MD, neighbor_table):
+    # Returns (path of packed states from start to goal, nodes expanded); empty path if unreachable.
+    # g and parent live in flat arrays indexed by rank_int instead of hash maps.
+    gbest = np.full(N_RANKS, 127, dtype=np.int8)
+    parent = np.empty(N_RANKS, dtype=np.int64)
+    heap = np.empty(1 << 16, dtype=np.int64)
+    mask = (np.int64(1) << 36) - 1
+    r0 = rank_int(start_int)
+    gbest[r0] = 0
+    parent[r0] = -1
+    heap[0] = (np.int64(manhattan_int(start_int, MD)) << 42) | (np.int64(63) << 36) | start_int
+    n = 1
+    expanded = 0
+    while n:
+        key = _heap_pop(heap, n)
+        n -= 1
+        s = key & mask
+        g = 63 - ((key >> 36) & 63)
+        f = key >> 42
+        r = rank_int(s)
+        if g > gbest[r]:
+            continue
+        if s == goal_int:
+            length = 0
+            p = s
+            while p != -1:
+                length += 1
+                p = parent[rank_int(p)]
+            path = np.empty(length, dtype=np.int64)
+            p = s
+            for k in range(length - 1, -1, -1):
+                path[k] = p
+                p = parent[rank_int(p)]
+            return path, expanded
+        expanded += 1
+        z = 0
+        while (s >> (4*z)) & 0xF:
+            z += 1
+        h = f - g
+        g2 = g + 1
+        for k in range(4):
+            j = np.int64(neighbor_table[z, k])
+            if j < 0:
+                break
+            tile = (s >> (4*j)) & 0xF
+            nxt = s + (tile << (4*z)) - (tile << (4*j))
+            rn = rank_int(nxt)
+            if g2 < gbest[rn]:
+                gbest[rn] = g2
+                parent[rn] = s
+                if n == heap.shape[0]:
+                    grown = np.empty(2*n, dtype=np.int64)
+                    grown[:n] = heap
+                    heap = grown
+                h2 = h - MD[j, tile] + MD[z, tile]
+                _heap_push(heap, n, ((g2 + h2) << 42) | ((63 - g2) << 36) | nxt)
+                n += 1
+    return np.empty(0, dtype=np.int64), expanded